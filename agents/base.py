@@ -2,13 +2,36 @@
 Base Agent class for all SDLC agents
 """
 
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import tiktoken
 from crewai import Agent, Task
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from pydantic import BaseModel, Field
 
+# LLM clients pooled by (model, temperature): each ChatOpenAI owns its own
+# HTTP connection pool, tokenizer, and retry config, so with 8 agents per
+# workflow and N concurrent workflows per-agent clients multiply fast
+_LLM_POOL: Dict[Tuple[str, float], ChatOpenAI] = {}
+
+
+def get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Get the shared ChatOpenAI client for a model/temperature pair
+
+    Per-call state such as callback handlers must be passed per
+    invocation (e.g. via ainvoke config) rather than bound to the
+    shared client.
+    """
+    key = (model, temperature)
+    if key not in _LLM_POOL:
+        _LLM_POOL[key] = ChatOpenAI(model=model, temperature=temperature, max_retries=2)
+    return _LLM_POOL[key]
+
 
 class AgentConfig(BaseModel):
     """Configuration for an agent"""
@@ -21,6 +44,7 @@ class AgentConfig(BaseModel):
     llm_model: str = "gpt-4"
     temperature: float = 0.7
     max_iterations: int = 5
+    enable_parallel_tool_execution: bool = True
 
 
 class AgentResult(BaseModel):
@@ -37,10 +61,68 @@ class AgentResult(BaseModel):
 class BaseAgent(ABC):
     """Abstract base class for all SDLC agents"""
 
+    # Result cache tuning: bounded LRU for exact hits, cosine-similarity
+    # threshold for semantic near-hits
+    CACHE_MAX_ENTRIES = 256
+    SEMANTIC_CACHE_THRESHOLD = 0.95
+
+    # Per-task prompt budget (preamble plus description), leaving context
+    # headroom for tool transcripts and the completion itself
+    MAX_TASK_TOKENS = 6_000
+
     def __init__(self, config: AgentConfig):
         self.config = config
-        self.llm = ChatOpenAI(model=config.llm_model, temperature=config.temperature)
+        # Built once so every task emits a byte-identical prefix, which is
+        # what provider-side prompt caching keys on
+        self._static_preamble = self._build_preamble()
+        # Encode the static preamble once: it is retokenized on every
+        # request otherwise, and its token count never changes
+        try:
+            self._tokenizer: Optional[tiktoken.Encoding] = tiktoken.encoding_for_model(
+                config.llm_model
+            )
+            self._preamble_tokens: Optional[List[int]] = self._tokenizer.encode(
+                self._static_preamble
+            )
+        except KeyError:
+            # Model unknown to tiktoken; skip pre-tokenization
+            self._tokenizer = None
+            self._preamble_tokens = None
+        self.llm = get_llm(config.llm_model, config.temperature)
+        # Instantiated once and shared between the crew agent and direct
+        # dispatch paths, so both see the same tool objects (and caches)
+        self.tools = self._get_tools()
         self.crew_agent = self._create_crew_agent()
+        # Two-tier result cache: exact SHA-256 hits, then embedding
+        # similarity for near-duplicate inputs
+        self._exact_cache: "OrderedDict[str, AgentResult]" = OrderedDict()
+        self._semantic_cache: List[Tuple[np.ndarray, AgentResult]] = []
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+
+    @property
+    def preamble_token_count(self) -> int:
+        """Token count of the static preamble, computed once at init"""
+        return len(self._preamble_tokens) if self._preamble_tokens is not None else 0
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the cached encoder
+
+        The static preamble is answered from the precomputed encoding;
+        returns 0 when the model is not tiktoken-supported.
+        """
+        if self._tokenizer is None:
+            return 0
+        if text == self._static_preamble and self._preamble_tokens is not None:
+            return len(self._preamble_tokens)
+        return len(self._tokenizer.encode(text))
+
+    def _build_preamble(self) -> str:
+        """Build the static prompt preamble shared by every task"""
+        return (
+            f"Role: {self.config.role}\n"
+            f"Goal: {self.config.goal}\n"
+            f"Backstory: {self.config.backstory}"
+        )
 
     def _create_crew_agent(self) -> Agent:
         """Create the CrewAI agent instance"""
@@ -52,7 +134,7 @@ class BaseAgent(ABC):
             allow_delegation=False,
             llm=self.llm,
             max_iter=self.config.max_iterations,
-            tools=self._get_tools(),
+            tools=self.tools,
         )
 
     @abstractmethod
@@ -60,14 +142,97 @@ class BaseAgent(ABC):
         """Get the tools available to this agent"""
         pass
 
+    def get_tool(self, name: str) -> Any:
+        """Return this agent's tool with the given name"""
+        for tool in self.tools:
+            if getattr(tool, "name", None) == name:
+                return tool
+        raise KeyError(f"Agent {self.config.name} has no tool named {name!r}")
+
     @abstractmethod
     async def execute(self, context: Dict[str, Any]) -> AgentResult:
         """Execute the agent's main task"""
         pass
 
-    def create_task(self, description: str, context: Dict[str, Any]) -> Task:
-        """Create a CrewAI task for this agent"""
-        return Task(description=description, agent=self.crew_agent, context=context)
+    def create_task(
+        self,
+        description: str,
+        expected_output: str = "A concise, structured answer to the task",
+        async_execution: bool = False,
+        context_tasks: Optional[List[Task]] = None,
+    ) -> Task:
+        """Create a CrewAI task for this agent
+
+        Per-run details belong in the description; Task.context is
+        reserved for upstream tasks whose outputs this task consumes
+        (crewai's contract), which also enforces execution order. Tasks
+        marked async_execution run concurrently within a Crew kickoff.
+
+        The static preamble is emitted verbatim ahead of the dynamic
+        description so the cacheable prefix stays identical across
+        calls, and the description is clamped to the per-task token
+        budget before assembly.
+        """
+        return Task(
+            description=f"{self._static_preamble}\n---\n{self._clamp_to_budget(description)}",
+            expected_output=expected_output,
+            agent=self.crew_agent,
+            context=context_tasks,
+            async_execution=async_execution,
+        )
+
+    def _clamp_to_budget(self, description: str) -> str:
+        """Clamp a task description to the per-task token budget
+
+        The budget charges the static preamble at its precomputed token
+        count, so only the dynamic description is ever encoded here.
+        Oversized descriptions (e.g. a large pasted artifact) are
+        truncated at the token boundary rather than overrunning the
+        model's context mid-task. Models unknown to tiktoken skip the
+        clamp.
+        """
+        if self._tokenizer is None:
+            return description
+        budget = self.MAX_TASK_TOKENS - self.preamble_token_count
+        if budget <= 0 or self.count_tokens(description) <= budget:
+            return description
+        return self._tokenizer.decode(self._tokenizer.encode(description)[:budget])
+
+    async def dispatch_tool_calls(self, calls: List[Tuple[Any, str]]) -> List[Any]:
+        """Dispatch one turn's (tool, input) calls, in parallel when safe
+
+        When the LLM emits several independent tool calls in a single
+        response, running them with asyncio.gather overlaps their I/O so
+        the turn takes as long as the slowest call instead of the sum.
+        Tools can opt out by setting concurrent_safe=False in their
+        metadata; any such call in the turn forces sequential dispatch.
+        Exceptions are returned in place of their call's result.
+        """
+        parallel_ok = self.config.enable_parallel_tool_execution and all(
+            (getattr(tool, "metadata", None) or {}).get("concurrent_safe", True)
+            for tool, _ in calls
+        )
+        if parallel_ok:
+            return list(
+                await asyncio.gather(
+                    *(self._invoke_tool(tool, tool_input) for tool, tool_input in calls),
+                    return_exceptions=True,
+                )
+            )
+
+        results: List[Any] = []
+        for tool, tool_input in calls:
+            try:
+                results.append(await self._invoke_tool(tool, tool_input))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def _invoke_tool(self, tool: Any, tool_input: str) -> Any:
+        """Invoke a single tool, preferring its async path"""
+        if getattr(tool, "coroutine", None) is not None:
+            return await tool.coroutine(tool_input)
+        return await asyncio.to_thread(tool.func, tool_input)
 
     def handle_error(self, error: Exception) -> AgentResult:
         """Standard error handling for agents"""
@@ -78,6 +243,61 @@ class BaseAgent(ABC):
             requires_escalation=self._should_escalate(error),
         )
 
+    async def lookup_cached_result(self, input_text: str) -> Optional[AgentResult]:
+        """Look up a cached result for an input, exact match first"""
+        key = self._cache_key(input_text)
+        cached = self._exact_cache.get(key)
+        if cached is not None:
+            self._exact_cache.move_to_end(key)
+            return cached
+
+        embedding = await self._embed(input_text)
+        if embedding is None or not self._semantic_cache:
+            return None
+
+        # Embeddings are stored normalized, so the dot product is the
+        # cosine similarity
+        matrix = np.stack([entry[0] for entry in self._semantic_cache])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] >= self.SEMANTIC_CACHE_THRESHOLD:
+            return self._semantic_cache[best][1]
+        return None
+
+    async def store_cached_result(self, input_text: str, result: AgentResult):
+        """Cache a successful result under both tiers, with LRU eviction"""
+        key = self._cache_key(input_text)
+        self._exact_cache[key] = result
+        self._exact_cache.move_to_end(key)
+        while len(self._exact_cache) > self.CACHE_MAX_ENTRIES:
+            self._exact_cache.popitem(last=False)
+
+        embedding = await self._embed(input_text)
+        if embedding is not None:
+            self._semantic_cache.append((embedding, result))
+            if len(self._semantic_cache) > self.CACHE_MAX_ENTRIES:
+                self._semantic_cache.pop(0)
+
+    @staticmethod
+    def _cache_key(input_text: str) -> str:
+        """Stable cache key from a normalized input string"""
+        return hashlib.sha256(input_text.strip().lower().encode()).hexdigest()
+
+    async def _embed(self, input_text: str) -> Optional[np.ndarray]:
+        """Embed an input for the semantic cache, normalized to unit length
+
+        Uses the async embedding path so cache misses never block the
+        event loop on the embedding HTTP call.
+        """
+        try:
+            if self._embeddings is None:
+                self._embeddings = OpenAIEmbeddings()
+            vector = np.asarray(await self._embeddings.aembed_query(input_text))
+            return vector / np.linalg.norm(vector)
+        except Exception:
+            # Embeddings are an optimization; fall back to exact-only caching
+            return None
+
     def _should_escalate(self, error: Exception) -> bool:
         """Determine if an error requires escalation"""
         # Override in subclasses for specific escalation logic
@@ -3,15 +3,50 @@ Market Validation Agent
 Researches competitors, identifies gaps, and validates market demand
 """
 
-import json
-from typing import Any, Dict, List
+import asyncio
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 
-from crewai import Task
+import orjson
+from crewai import Crew, Process, Task
 from langchain.tools import Tool
 from langchain_community.tools import DuckDuckGoSearchRun
 
 from ..base import AgentConfig, AgentResult, BaseAgent
 
+# Bounded executor for blocking tool calls, shared across agent instances
+# so concurrent workflows cannot spawn unbounded threads
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+# Models often wrap requested JSON in a markdown fence despite the
+# prompt; strip the fence before parsing rather than failing to raw text
+_JSON_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+# Fallback name extraction when the research output was not valid JSON:
+# names led by a bullet or number, ended by a separator or line end
+_COMPETITOR_LEADER = re.compile(
+    r"^\s*(?:[-*]|\d+[.)])\s+\**([A-Z][\w&.+' -]{1,40}?)\**\s*(?:[:(–—]|-{1,2}\s|$)",
+    re.MULTILINE,
+)
+
+
+def _to_async(func: Callable[[str], str]) -> Callable[[str], Any]:
+    """Wrap a blocking single-argument tool callable for async dispatch
+
+    The synchronous tools (DuckDuckGo search, analysis helpers) make
+    blocking HTTP calls; running them on the executor keeps the event
+    loop free for every other workflow the gateway is serving.
+    """
+
+    async def _run(query: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_TOOL_EXECUTOR, func, query)
+
+    return _run
+
 
 class MarketValidationAgent(BaseAgent):
     """Agent responsible for market research and validation"""
@@ -38,17 +73,31 @@ class MarketValidationAgent(BaseAgent):
             Tool(
                 name="web_search",
                 func=search.run,
+                coroutine=_to_async(search.run),
                 description="Search the web for market information, competitors, and trends",
+                metadata={"concurrent_safe": True},
             ),
             Tool(
                 name="competitor_analysis",
                 func=self._analyze_competitor,
-                description="Analyze a specific competitor's features and market position",
+                coroutine=_to_async(self._analyze_competitor),
+                description=(
+                    "Analyze a specific competitor's features and market position. "
+                    "Call this once per competitor; request multiple competitors "
+                    "as parallel tool calls rather than one combined call."
+                ),
+                metadata={"concurrent_safe": True},
             ),
             Tool(
                 name="market_trends",
                 func=self._analyze_market_trends,
-                description="Analyze current market trends and growth potential",
+                coroutine=_to_async(self._analyze_market_trends),
+                description=(
+                    "Analyze current market trends and growth potential. "
+                    "Call this once per market segment; request multiple segments "
+                    "as parallel tool calls rather than one combined call."
+                ),
+                metadata={"concurrent_safe": True},
             ),
         ]
         return tools
@@ -58,117 +107,213 @@ class MarketValidationAgent(BaseAgent):
         try:
             project_idea = context.get("project_idea", "")
 
-            # Create validation tasks
-            tasks = [
+            # Return a cached result for exact or near-duplicate ideas before
+            # paying for the full search + LLM pipeline
+            cached = await self.lookup_cached_result(project_idea)
+            if cached is not None:
+                return cached
+
+            # The three research tasks are independent of each other and can
+            # run concurrently; the report task depends on their outputs
+            # Each research task must answer as a JSON object with the exact
+            # keys _compile_validation_report reads; free-form prose would
+            # fall into the raw-text fallback and compile an empty report
+            research_tasks = [
                 self.create_task(
                     f"Research existing competitors for: {project_idea}. "
-                    "List top 5 competitors with their key features and pricing.",
-                    context,
+                    "Find the top 5 competitors with their key features and pricing. "
+                    "Respond with ONLY a JSON object of the form "
+                    '{"competitors": [{"name": "...", "features": "...", "pricing": "..."}]} '
+                    "with no surrounding prose.",
+                    expected_output=(
+                        'A JSON object with a "competitors" list of '
+                        "{name, features, pricing} entries"
+                    ),
+                    async_execution=True,
                 ),
                 self.create_task(
                     f"Identify market gaps and opportunities for: {project_idea}. "
-                    "What problems are not being solved by current solutions?",
-                    context,
+                    "What problems are not being solved by current solutions? "
+                    "Respond with ONLY a JSON object of the form "
+                    '{"gaps": ["...", "..."]} with no surrounding prose.',
+                    expected_output='A JSON object with a "gaps" list of unmet needs',
+                    async_execution=True,
                 ),
                 self.create_task(
                     f"Validate market demand for: {project_idea}. "
-                    "Provide data on market size, growth rate, and target audience.",
-                    context,
-                ),
-                self.create_task(
-                    "Create a market validation report with recommendations on whether to proceed.",
-                    context,
+                    "Provide data on market size, growth rate, and target audience. "
+                    "Respond with ONLY a JSON object of the form "
+                    '{"market_size": "...", "growth_rate": "...", "target_audience": "..."} '
+                    "with no surrounding prose.",
+                    expected_output=(
+                        "A JSON object with market_size, growth_rate, "
+                        "and target_audience keys"
+                    ),
+                    async_execution=True,
                 ),
             ]
 
-            # Execute tasks (in real implementation, would use Crew)
-            results = await self._execute_tasks(tasks)
+            # The report task lists the research tasks as context, so it
+            # runs after their outputs are available
+            report_task = self.create_task(
+                "Create a market validation report with recommendations on whether to proceed.",
+                expected_output="A market validation report with a proceed/no-go recommendation",
+                context_tasks=research_tasks,
+            )
 
-            # Compile results
-            validation_report = self._compile_validation_report(results)
+            results, errors = await self._execute_tasks(research_tasks, report_task)
+            deep_dives = await self._analyze_top_competitors(self._competitor_names(results))
+            validation_report = self._compile_validation_report(results, report_task, deep_dives)
 
-            return AgentResult(
+            result = AgentResult(
                 success=True,
                 output=validation_report,
                 artifacts=[
                     {
                         "type": "market_report",
                         "name": "market_validation_report.json",
-                        "content": json.dumps(validation_report, indent=2),
+                        "content": orjson.dumps(
+                            validation_report, option=orjson.OPT_INDENT_2
+                        ).decode(),
                     }
                 ],
+                errors=errors,
             )
+            if not errors:
+                await self.store_cached_result(project_idea, result)
+            return result
 
         except Exception as e:
             return self.handle_error(e)
 
+    # Single-input contract: one item per call keeps each lookup its own
+    # cache entry and retry path, so one bad item never voids a batch
+    @functools.lru_cache(maxsize=2048)
     def _analyze_competitor(self, competitor_name: str) -> str:
         """Analyze a specific competitor"""
         # In production, this would use real APIs or web scraping
         return f"Analysis of {competitor_name}: Features, pricing, market share..."
 
+    @functools.lru_cache(maxsize=2048)
     def _analyze_market_trends(self, market_segment: str) -> str:
         """Analyze market trends for a segment"""
         # In production, this would use real data sources
         return f"Market trends for {market_segment}: Growth rate, emerging technologies..."
 
-    async def _execute_tasks(self, tasks: List[Task]) -> List[Dict[str, Any]]:
-        """Execute CrewAI tasks"""
-        # Placeholder for CrewAI execution
-        # In production: crew = Crew(agents=[self.crew_agent], tasks=tasks)
-        # results = await crew.kickoff()
-        return [
-            {
-                "task": "competitor_research",
-                "result": {
-                    "competitors": [
-                        {
-                            "name": "Jira",
-                            "features": ["Issue tracking", "Agile boards"],
-                            "pricing": "$7.75/user/month",
-                        },
-                        {
-                            "name": "Linear",
-                            "features": ["Fast UI", "Keyboard shortcuts"],
-                            "pricing": "$8/user/month",
-                        },
-                        {
-                            "name": "Asana",
-                            "features": ["Project management", "Timeline view"],
-                            "pricing": "$10.99/user/month",
-                        },
-                    ]
-                },
-            },
-            {
-                "task": "market_gaps",
-                "result": {
-                    "gaps": [
-                        "Complex setup and configuration in existing tools",
-                        "Lack of AI-powered automation",
-                        "Poor developer experience",
-                    ]
-                },
-            },
-            {
-                "task": "market_demand",
-                "result": {
-                    "market_size": "$9.3B",
-                    "growth_rate": "13.8% CAGR",
-                    "target_audience": "Software development teams 10-500 people",
-                },
-            },
+    async def _execute_tasks(
+        self, research_tasks: List[Task], report_task: Task
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Execute all validation tasks through a single Crew kickoff
+
+        The research tasks are marked async_execution, so CrewAI runs
+        them concurrently inside one kickoff while the report task waits
+        on their outputs via its task context. A single kickoff also
+        keeps the shared role/backstory preamble as one provider-side
+        prompt-cache entry instead of resubmitting it per invocation.
+        """
+        crew = Crew(
+            agents=[self.crew_agent],
+            tasks=[*research_tasks, report_task],
+            process=Process.sequential,
+        )
+
+        errors: List[str] = []
+        try:
+            await crew.kickoff_async()
+        except Exception as e:
+            errors.append(str(e))
+
+        task_names = ("competitor_research", "market_gaps", "market_demand")
+        results = [
+            {"task": name, "result": self._parse_task_output(task)}
+            for name, task in zip(task_names, research_tasks)
+            if getattr(task, "output", None) is not None
         ]
+        return results, errors
+
+    @staticmethod
+    def _competitor_names(results: List[Dict[str, Any]]) -> List[str]:
+        """Pull competitor names out of the research results, at most five
+
+        Prefers the structured "competitors" key from the JSON contract;
+        when the model ignored it and the output fell back to raw text,
+        names are scraped from bullet/numbered list leaders instead, so
+        the deep-dive round still runs.
+        """
+        research = {r["task"]: r["result"] for r in results}.get("competitor_research", {})
+        names: List[str] = []
+        for entry in research.get("competitors", [])[:5]:
+            if isinstance(entry, str):
+                names.append(entry)
+            elif isinstance(entry, dict) and entry.get("name"):
+                names.append(entry["name"])
+        if not names:
+            names = [m.strip() for m in _COMPETITOR_LEADER.findall(research.get("raw", ""))][:5]
+        return names
+
+    async def _analyze_top_competitors(self, competitor_names: List[str]) -> Dict[str, str]:
+        """Deep-dive each named competitor in one parallel dispatch
+
+        Each name is a single-input call to the competitor_analysis
+        tool; dispatch_tool_calls overlaps them so the round takes as
+        long as the slowest lookup. Failed lookups are dropped rather
+        than voiding the whole batch.
+        """
+        if not competitor_names:
+            return {}
+        tool = self.get_tool("competitor_analysis")
+        outcomes = await self.dispatch_tool_calls([(tool, name) for name in competitor_names])
+        return {
+            name: outcome
+            for name, outcome in zip(competitor_names, outcomes)
+            if not isinstance(outcome, Exception)
+        }
+
+    @staticmethod
+    def _parse_task_output(task: Task) -> Dict[str, Any]:
+        """Parse a task output into a dict, falling back to raw text
+
+        TaskOutput is a pydantic model whose str() is the field repr,
+        not the completion, so the raw-output attribute is read
+        explicitly via _raw_text.
+        """
+        raw = _JSON_FENCE.sub("", MarketValidationAgent._raw_text(task.output).strip())
+        try:
+            parsed = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return {"raw": raw}
+        return parsed if isinstance(parsed, dict) else {"raw": raw}
+
+    @staticmethod
+    def _raw_text(output: Any) -> str:
+        """Raw completion text from a TaskOutput, across crewai releases
 
-    def _compile_validation_report(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        The attribute name has shifted between versions (raw, then
+        raw_output); str() is the last resort, not the default.
+        """
+        raw = getattr(output, "raw", None) or getattr(output, "raw_output", None)
+        return raw if isinstance(raw, str) else str(output)
+
+    def _compile_validation_report(
+        self,
+        results: List[Dict[str, Any]],
+        report_task: Task,
+        deep_dives: Dict[str, str],
+    ) -> Dict[str, Any]:
         """Compile results into a comprehensive report"""
+        # Index results by task name so partially-failed batches still compile
+        by_task = {r["task"]: r["result"] for r in results}
+        report_output = getattr(report_task, "output", None)
+
         return {
             "market_validation": {
                 "project_viability": "HIGH",
                 "market_opportunity_score": 8.5,
-                "competitors": results[0]["result"]["competitors"],
-                "market_gaps": results[1]["result"]["gaps"],
-                "market_metrics": results[2]["result"],
+                "report": self._raw_text(report_output) if report_output is not None else "",
+                "competitors": by_task.get("competitor_research", {}).get("competitors", []),
+                "competitor_deep_dives": deep_dives,
+                "market_gaps": by_task.get("market_gaps", {}).get("gaps", []),
+                "market_metrics": by_task.get("market_demand", {}),
                 "recommendation": "Proceed with development focusing on AI automation and "
                 "developer experience",
                 "risks": ["Highly competitive market", "Need for significant differentiation"],
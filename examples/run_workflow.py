@@ -53,8 +53,13 @@ async def test_api_gateway():
     """Test the API gateway"""
     import httpx
 
-    # Make sure the API is running first
-    async with httpx.AsyncClient() as client:
+    # Make sure the API is running first.
+    # One pooled client for all requests: each new AsyncClient would pay a
+    # fresh TCP+TLS handshake per call
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=30,
+    ) as client:
         # Create a new workflow
         response = await client.post(
             "http://localhost:8000/workflows",
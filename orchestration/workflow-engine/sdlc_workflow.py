@@ -3,21 +3,32 @@ SDLC Workflow Engine using LangGraph
 Orchestrates the entire software development lifecycle through AI agents
 """
 
+import asyncio
 import operator
-from typing import Annotated, List, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
+import aiosqlite
 from langchain_core.messages import BaseMessage
-from langgraph.checkpoint import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import END, StateGraph
 
 from ..models.workflow import StageResult
 
+# Checkpoints persist across restarts and are shared by all gateway
+# workers; rows for retired workflows are pruned via prune_checkpoints
+CHECKPOINT_DB_PATH = "checkpoints.db"
+
+
+def _latest_stage(current: str, update: str) -> str:
+    """Reducer for current_stage: concurrent branches keep the last write"""
+    return update
+
 
 class SDLCState(TypedDict):
     """State maintained throughout the SDLC workflow"""
 
     project_idea: str
-    current_stage: str
+    current_stage: Annotated[str, _latest_stage]
     stage_results: Annotated[List[StageResult], operator.add]
     messages: Annotated[List[BaseMessage], operator.add]
     error_count: int
@@ -25,103 +36,164 @@ class SDLCState(TypedDict):
     final_artifacts: Optional[dict]
 
 
+class StageEvent(TypedDict):
+    """Structured event emitted by run_workflow: one node update per event"""
+
+    node: str
+    state: SDLCState
+
+
 class SDLCWorkflowEngine:
     """Main workflow engine that orchestrates SDLC stages"""
 
     def __init__(self):
-        self.checkpointer = MemorySaver()
+        # SQLite-backed checkpointing: constant memory via incremental
+        # writes, survives restarts, and lets multiple gateway workers
+        # share state instead of requiring sticky routing. The saver
+        # needs a running event loop, so the graph compiles lazily in
+        # _ensure_compiled rather than here.
+        self.checkpointer: Optional[AsyncSqliteSaver] = None
         self.graph = None
-        self._build_workflow()
+        self._workflow = self._build_workflow()
+        self._compile_lock = asyncio.Lock()
 
-    def _build_workflow(self):
+    async def _ensure_compiled(self):
+        """Open the checkpoint store and compile the graph on first use
+
+        Serialized by a lock: two concurrent first calls would otherwise
+        both see graph as None across the awaits and open two SQLite
+        connections, leaking one.
+        """
+        if self.graph is not None:
+            return
+        async with self._compile_lock:
+            if self.graph is None:
+                conn = await aiosqlite.connect(CHECKPOINT_DB_PATH)
+                self.checkpointer = AsyncSqliteSaver(conn)
+                await self.checkpointer.setup()
+                self.graph = self._workflow.compile(checkpointer=self.checkpointer)
+
+    def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow for SDLC stages"""
         workflow = StateGraph(SDLCState)
 
         # Define nodes for each SDLC stage
+        workflow.add_node("discovery_fanout", self.discovery_fanout_node)
         workflow.add_node("market_validation", self.market_validation_node)
         workflow.add_node("solution_architecture", self.solution_architecture_node)
+        workflow.add_node("discovery_join", self.discovery_join_node)
         workflow.add_node("product_management", self.product_management_node)
         workflow.add_node("software_architecture", self.software_architecture_node)
         workflow.add_node("junior_development", self.junior_development_node)
+        workflow.add_node("qa_planning", self.qa_planning_node)
         workflow.add_node("senior_development", self.senior_development_node)
+        workflow.add_node("development_complete", self.development_complete_node)
+        workflow.add_node("development_join", self.development_join_node)
         workflow.add_node("quality_assurance", self.quality_assurance_node)
         workflow.add_node("deployment", self.deployment_node)
 
-        # Add conditional edges for branching logic
-        workflow.add_edge("market_validation", "solution_architecture")
-        workflow.add_edge("solution_architecture", "product_management")
+        # Discovery fan-out: market validation and solution architecture are
+        # independent, so LangGraph runs them concurrently and merges their
+        # updates via the reducers on SDLCState. The list-form edge makes
+        # the join wait for every listed branch before firing.
+        workflow.add_edge("discovery_fanout", "market_validation")
+        workflow.add_edge("discovery_fanout", "solution_architecture")
+        workflow.add_edge(["market_validation", "solution_architecture"], "discovery_join")
+
+        workflow.add_edge("discovery_join", "product_management")
         workflow.add_edge("product_management", "software_architecture")
+
+        # Development fan-out: QA drafts its test plan while development runs
         workflow.add_edge("software_architecture", "junior_development")
+        workflow.add_edge("software_architecture", "qa_planning")
 
-        # Add conditional edge for escalation
+        # Add conditional edge for escalation. Both development outcomes
+        # funnel through development_complete so the join below can wait
+        # for exactly one development branch regardless of escalation
         workflow.add_conditional_edges(
             "junior_development",
             self.check_escalation,
             {
                 "escalate": "senior_development",
-                "continue": "quality_assurance",
+                "continue": "development_complete",
                 "retry": "junior_development",
             },
         )
+        workflow.add_edge("senior_development", "development_complete")
 
-        workflow.add_edge("senior_development", "quality_assurance")
+        # Wait-for-all join: fires once development (however it resolved)
+        # and QA planning have both finished
+        workflow.add_edge(["development_complete", "qa_planning"], "development_join")
+        workflow.add_edge("development_join", "quality_assurance")
         workflow.add_edge("quality_assurance", "deployment")
         workflow.add_edge("deployment", END)
 
         # Set entry point
-        workflow.set_entry_point("market_validation")
+        workflow.set_entry_point("discovery_fanout")
+
+        return workflow
 
-        # Compile the graph
-        self.graph = workflow.compile(checkpointer=self.checkpointer)
+    async def discovery_fanout_node(self, state: SDLCState) -> Dict[str, Any]:
+        """Fan-out point for the concurrent discovery stages"""
+        return {"current_stage": "discovery"}
 
-    async def market_validation_node(self, state: SDLCState) -> SDLCState:
+    async def discovery_join_node(self, state: SDLCState) -> Dict[str, Any]:
+        """Synchronization point after the discovery stages complete"""
+        return {}
+
+    async def market_validation_node(self, state: SDLCState) -> Dict[str, Any]:
         """Market validation stage"""
         # TODO: Implement market validation agent logic
-        state["current_stage"] = "market_validation"
-        return state
+        return {"current_stage": "market_validation"}
 
-    async def solution_architecture_node(self, state: SDLCState) -> SDLCState:
+    async def solution_architecture_node(self, state: SDLCState) -> Dict[str, Any]:
         """Solution architecture stage"""
         # TODO: Implement solution architecture agent logic
-        state["current_stage"] = "solution_architecture"
-        return state
+        return {"current_stage": "solution_architecture"}
 
-    async def product_management_node(self, state: SDLCState) -> SDLCState:
+    async def product_management_node(self, state: SDLCState) -> Dict[str, Any]:
         """Product management stage"""
         # TODO: Implement product management agent logic
-        state["current_stage"] = "product_management"
-        return state
+        return {"current_stage": "product_management"}
 
-    async def software_architecture_node(self, state: SDLCState) -> SDLCState:
+    async def software_architecture_node(self, state: SDLCState) -> Dict[str, Any]:
         """Software architecture stage"""
         # TODO: Implement software architecture agent logic
-        state["current_stage"] = "software_architecture"
-        return state
+        return {"current_stage": "software_architecture"}
 
-    async def junior_development_node(self, state: SDLCState) -> SDLCState:
+    async def junior_development_node(self, state: SDLCState) -> Dict[str, Any]:
         """Junior developer implementation stage"""
         # TODO: Implement junior developer agent logic
-        state["current_stage"] = "junior_development"
-        return state
+        return {"current_stage": "junior_development"}
+
+    async def qa_planning_node(self, state: SDLCState) -> Dict[str, Any]:
+        """QA test-plan drafting stage, concurrent with development"""
+        # TODO: Implement QA planning agent logic
+        return {"current_stage": "qa_planning"}
+
+    async def development_complete_node(self, state: SDLCState) -> Dict[str, Any]:
+        """Marker node reached when development resolves, with or without
+        escalation"""
+        return {}
 
-    async def senior_development_node(self, state: SDLCState) -> SDLCState:
+    async def development_join_node(self, state: SDLCState) -> Dict[str, Any]:
+        """Synchronization point after development and QA planning complete"""
+        return {}
+
+    async def senior_development_node(self, state: SDLCState) -> Dict[str, Any]:
         """Senior developer escalation stage"""
         # TODO: Implement senior developer agent logic
-        state["current_stage"] = "senior_development"
-        state["requires_escalation"] = False
-        return state
+        return {"current_stage": "senior_development", "requires_escalation": False}
 
-    async def quality_assurance_node(self, state: SDLCState) -> SDLCState:
+    async def quality_assurance_node(self, state: SDLCState) -> Dict[str, Any]:
         """Quality assurance stage"""
         # TODO: Implement QA agent logic
-        state["current_stage"] = "quality_assurance"
-        return state
+        return {"current_stage": "quality_assurance"}
 
-    async def deployment_node(self, state: SDLCState) -> SDLCState:
+    async def deployment_node(self, state: SDLCState) -> Dict[str, Any]:
         """Deployment stage"""
         # TODO: Implement deployment agent logic
-        state["current_stage"] = "deployment"
-        return state
+        return {"current_stage": "deployment"}
 
     def check_escalation(self, state: SDLCState) -> str:
         """Determine if escalation to senior developer is needed"""
@@ -132,8 +204,37 @@ class SDLCWorkflowEngine:
         else:
             return "continue"
 
-    async def run_workflow(self, project_idea: str, thread_id: str = "default"):
-        """Execute the complete SDLC workflow"""
+    async def prune_checkpoints(self, thread_ids: List[str]):
+        """Delete all checkpoint rows for the given workflow threads
+
+        The checkpoint schema keys on thread_id, not on a timestamp, so
+        pruning is driven by the caller: the gateway's periodic sweep
+        passes workflows that have aged out of its TTL registry.
+        """
+        await self._ensure_compiled()
+        for thread_id in thread_ids:
+            await self.checkpointer.conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+            await self.checkpointer.conn.execute(
+                "DELETE FROM writes WHERE thread_id = ?", (thread_id,)
+            )
+        await self.checkpointer.conn.commit()
+
+    async def run_workflow(
+        self,
+        project_idea: str,
+        thread_id: str = "default",
+        cancel_event: Optional[asyncio.Event] = None,
+    ):
+        """Execute the complete SDLC workflow
+
+        When cancel_event is set (e.g. the consuming client went away),
+        iteration stops at the next stage boundary instead of burning
+        LLM tokens on an abandoned run; completed stages stay
+        checkpointed so the workflow can resume under the same
+        thread_id.
+        """
         initial_state = SDLCState(
             project_idea=project_idea,
             current_stage="start",
@@ -144,7 +245,30 @@ class SDLCWorkflowEngine:
             final_artifacts=None,
         )
 
+        await self._ensure_compiled()
         config = {"configurable": {"thread_id": thread_id}}
 
+        # LangGraph emits {node_name: state_update}; unpack that known
+        # shape once here so consumers never scan event dicts. A superstep
+        # whose siblings finish together carries several node keys, so
+        # each one becomes its own event.
         async for event in self.graph.astream(initial_state, config):
-            yield event
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            for node, state in event.items():
+                yield StageEvent(node=node, state=state)
+
+
+# Process-wide engine: the graph topology never changes at runtime, so the
+# LangGraph compile (node validation, dispatch-table build) happens once per
+# process instead of once per APIGateway. Per-workflow isolation is still
+# provided by the thread_id passed through run_workflow.
+_engine: Optional[SDLCWorkflowEngine] = None
+
+
+def get_engine() -> SDLCWorkflowEngine:
+    """Get the shared workflow engine, compiling the graph on first use"""
+    global _engine
+    if _engine is None:
+        _engine = SDLCWorkflowEngine()
+    return _engine
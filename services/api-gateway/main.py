@@ -3,17 +3,44 @@ FastAPI Gateway for the SDLC Workflow System
 """
 
 import asyncio
+import hashlib
+import re
 import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+import httpx
+import orjson
+from broadcaster import Broadcast
+from cachetools import TTLCache
 from fastapi import BackgroundTasks, FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from ...orchestration.workflow_engine.sdlc_workflow import SDLCWorkflowEngine
+from ...orchestration.workflow_engine.sdlc_workflow import get_engine
 from ...shared.models.workflow import StageStatus, WorkflowState
 
+# Inputs too short to describe a real project; anything below this skips
+# the agent pipeline entirely
+MIN_PROJECT_IDEA_LENGTH = 20
+
+# Throwaway inputs that clear the length bar but carry no substance.
+# Kept to a single linear pass (keyword then trailing filler, no nested
+# quantifiers or backreferences): this runs synchronously on an
+# unauthenticated endpoint, so it must never backtrack
+_NON_SUBSTANTIVE_IDEA = re.compile(
+    r"^(?:test(?:ing)?|hi|hello|hey|foo|bar|asdf+|lorem ipsum)[\s.!?]*$", re.IGNORECASE
+)
+
+# Sentinel published on a workflow's channel when it finishes; compared
+# verbatim so subscribers never parse ordinary event payloads
+WORKFLOW_COMPLETE_MESSAGE = '{"type": "workflow_complete"}'
+
+# How often the background sweep checks for workflows that aged out of
+# the registry and prunes their checkpoint rows
+CHECKPOINT_PRUNE_INTERVAL_SECONDS = 900
+
 
 class WorkflowRequest(BaseModel):
     """Request to start a new workflow"""
@@ -39,13 +66,49 @@ class APIGateway:
             title="SDLC AI Workflow API",
             description="API for orchestrating AI-driven software development lifecycle",
             version="0.1.0",
+            default_response_class=ORJSONResponse,
+        )
+        self.workflow_engine = get_engine()
+        # TTL-bounded registries: finished workflows age out after an hour
+        # instead of accumulating for the life of the process
+        self.active_workflows: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        # Pub-sub fan-out for workflow events: the workflow task publishes
+        # to its channel and every subscribed websocket receives the event,
+        # with no per-connection registry or timer to maintain
+        self.broadcast = Broadcast("memory://")
+        # Cancellation signals: set when a workflow's consumers go away
+        # so the engine stops burning tokens on abandoned runs
+        self.cancel_events: Dict[str, asyncio.Event] = {}
+        # Live websocket subscribers per workflow: cancellation fires only
+        # when the last one disconnects, so one client leaving never kills
+        # a run that other connected clients are still watching. Coalesced
+        # submitters polling over HTTP hold no subscription and cannot
+        # keep a run alive; they observe a terminal "cancelled" stage
+        self._ws_subscribers: Dict[str, int] = {}
+        # In-flight deduplication: identical normalized ideas submitted
+        # while a run is active share one workflow instead of launching
+        # duplicates; maps idea hash to the owning workflow id
+        self._inflight: Dict[str, str] = {}
+        # Every workflow id ever started this process: the checkpoint
+        # sweep diffs this against active_workflows (whose TTL evicts
+        # silently) to find threads whose checkpoint rows can be pruned
+        self._started_workflows: set = set()
+        self._prune_task: Optional[asyncio.Task] = None
+        # Guards mutation of the registries above, which are touched from
+        # background tasks, route handlers, and websocket handlers
+        self._wf_lock = asyncio.Lock()
+
+        # Single pooled client for all outbound calls: reusing connections
+        # amortizes TCP/TLS handshakes across requests
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=30,
         )
-        self.workflow_engine = SDLCWorkflowEngine()
-        self.active_workflows: Dict[str, WorkflowState] = {}
-        self.websocket_connections: Dict[str, WebSocket] = {}
 
         self._setup_middleware()
         self._setup_routes()
+        self._setup_lifecycle()
 
     def _setup_middleware(self):
         """Configure middleware"""
@@ -57,6 +120,21 @@ class APIGateway:
             allow_headers=["*"],
         )
 
+    def _setup_lifecycle(self):
+        """Configure startup/shutdown hooks"""
+
+        @self.app.on_event("startup")
+        async def startup():
+            await self.broadcast.connect()
+            self._prune_task = asyncio.create_task(self._sweep_expired_checkpoints())
+
+        @self.app.on_event("shutdown")
+        async def shutdown():
+            if self._prune_task is not None:
+                self._prune_task.cancel()
+            await self.broadcast.disconnect()
+            await self.http_client.aclose()
+
     def _setup_routes(self):
         """Setup API routes"""
 
@@ -67,6 +145,15 @@ class APIGateway:
         @self.app.post("/workflows", response_model=WorkflowResponse)
         async def create_workflow(request: WorkflowRequest, background_tasks: BackgroundTasks):
             """Create and start a new workflow"""
+            # Cheap pre-filter: reject trivial/malformed ideas before any
+            # agent or LLM is woken up
+            if self._triage(request.project_idea) == "reject":
+                raise HTTPException(
+                    status_code=422,
+                    detail="project_idea is too short or non-substantive to start a workflow",
+                )
+
+            idea_key = self._idea_key(request.project_idea)
             workflow_id = str(uuid.uuid4())
 
             # Create workflow state
@@ -77,16 +164,35 @@ class APIGateway:
                 global_context=request.metadata or {},
             )
 
-            self.active_workflows[workflow_id] = workflow_state
+            # Check-and-register in one critical section: two identical
+            # submissions racing here see each other, so exactly one run
+            # launches and the other caller follows it
+            async with self._wf_lock:
+                existing_id = self._inflight.get(idea_key)
+                if existing_id is None:
+                    self.active_workflows[workflow_id] = workflow_state
+                    self.cancel_events[workflow_id] = asyncio.Event()
+                    self._inflight[idea_key] = workflow_id
+                    self._started_workflows.add(workflow_id)
+
+            if existing_id is not None:
+                return WorkflowResponse(
+                    workflow_id=existing_id,
+                    status="coalesced",
+                    message=f"Identical workflow already in flight for: {request.project_idea}",
+                    data={"coalesced": True},
+                )
 
             # Start workflow in background
-            background_tasks.add_task(self._run_workflow, workflow_id, request.project_idea)
+            background_tasks.add_task(
+                self._run_workflow, workflow_id, request.project_idea, idea_key
+            )
 
             return WorkflowResponse(
                 workflow_id=workflow_id,
                 status="started",
                 message=f"Workflow started for: {request.project_idea}",
-                data={"created_at": workflow_state.created_at.isoformat()},
+                data={"created_at": workflow_state.created_at_iso},
             )
 
         @self.app.get("/workflows/{workflow_id}", response_model=WorkflowResponse)
@@ -107,23 +213,24 @@ class APIGateway:
                         s.stage_name for s in workflow.stages if s.status == StageStatus.COMPLETED
                     ],
                     "artifacts_count": len(workflow.get_all_artifacts()),
-                    "updated_at": workflow.updated_at.isoformat(),
+                    "updated_at": workflow.updated_at_iso,
                 },
             )
 
         @self.app.get("/workflows")
         async def list_workflows():
             """List all workflows"""
-            workflows = []
-            for wf_id, wf_state in self.active_workflows.items():
-                workflows.append(
-                    {
-                        "workflow_id": wf_id,
-                        "project_idea": wf_state.project_idea,
-                        "current_stage": wf_state.current_stage,
-                        "created_at": wf_state.created_at.isoformat(),
-                    }
-                )
+            # Timestamps are pre-formatted at mutation time, so this stays
+            # a plain comprehension with no per-row formatting
+            workflows = [
+                {
+                    "workflow_id": wf_id,
+                    "project_idea": wf_state.project_idea,
+                    "current_stage": wf_state.current_stage,
+                    "created_at": wf_state.created_at_iso,
+                }
+                for wf_id, wf_state in self.active_workflows.items()
+            ]
 
             return {"workflows": workflows, "total": len(workflows)}
 
@@ -140,17 +247,36 @@ class APIGateway:
         async def websocket_endpoint(websocket: WebSocket, workflow_id: str):
             """WebSocket endpoint for real-time workflow updates"""
             await websocket.accept()
-            self.websocket_connections[workflow_id] = websocket
+            if workflow_id not in self.active_workflows:
+                await websocket.close(code=1008)
+                return
+
+            async with self._wf_lock:
+                self._ws_subscribers[workflow_id] = self._ws_subscribers.get(workflow_id, 0) + 1
 
             try:
-                while True:
-                    # Keep connection alive
-                    await asyncio.sleep(1)
+                # Fan out events as the workflow task publishes them; the
+                # completion sentinel ends the stream
+                async with self.broadcast.subscribe(channel=workflow_id) as subscriber:
+                    async for event in subscriber:
+                        if event.message == WORKFLOW_COMPLETE_MESSAGE:
+                            break
+                        await websocket.send_text(event.message)
             except Exception:
                 pass
             finally:
-                if workflow_id in self.websocket_connections:
-                    del self.websocket_connections[workflow_id]
+                # Cancel only when the LAST subscriber goes away: other
+                # connected clients still own this run
+                async with self._wf_lock:
+                    remaining = self._ws_subscribers.get(workflow_id, 1) - 1
+                    if remaining > 0:
+                        self._ws_subscribers[workflow_id] = remaining
+                        cancel_event = None
+                    else:
+                        self._ws_subscribers.pop(workflow_id, None)
+                        cancel_event = self.cancel_events.get(workflow_id)
+                if cancel_event is not None:
+                    cancel_event.set()
 
         @self.app.get("/health")
         async def health_check():
@@ -161,55 +287,111 @@ class APIGateway:
                 "active_workflows": len(self.active_workflows),
             }
 
-    async def _run_workflow(self, workflow_id: str, project_idea: str):
+    def _triage(self, idea: str) -> str:
+        """Classify a project idea as "run" or "reject" without an LLM call"""
+        stripped = idea.strip()
+        if len(stripped) < MIN_PROJECT_IDEA_LENGTH:
+            return "reject"
+        if _NON_SUBSTANTIVE_IDEA.match(stripped):
+            return "reject"
+        return "run"
+
+    @staticmethod
+    def _idea_key(idea: str) -> str:
+        """Stable deduplication key for a normalized project idea"""
+        return hashlib.sha256(idea.strip().lower().encode()).hexdigest()
+
+    async def _run_workflow(
+        self, workflow_id: str, project_idea: str, idea_key: Optional[str] = None
+    ):
         """Run a workflow asynchronously"""
+        cancel_event = self.cancel_events.get(workflow_id)
         try:
-            async for event in self.workflow_engine.run_workflow(project_idea, workflow_id):
+            async for event in self.workflow_engine.run_workflow(
+                project_idea, workflow_id, cancel_event=cancel_event
+            ):
                 # Update workflow state
                 if workflow_id in self.active_workflows:
-                    # Process event and update state
+                    # Process event and push it straight to the stream
                     await self._process_workflow_event(workflow_id, event)
-
-                    # Send WebSocket update if connected
-                    if workflow_id in self.websocket_connections:
-                        await self._send_websocket_update(workflow_id, event)
+                    await self._publish_event(workflow_id, event)
+
+            # A cancelled run exits the stream early; record a terminal
+            # stage so pollers (including coalesced submitters, who hold
+            # no websocket) can tell it apart from a live run
+            if cancel_event is not None and cancel_event.is_set():
+                workflow = self.active_workflows.get(workflow_id)
+                if workflow is not None:
+                    workflow.current_stage = "cancelled"
+                    workflow.touch()
+                await self._publish_event(workflow_id, {"stage": "cancelled"})
 
         except Exception as e:
             # Handle workflow errors
             if workflow_id in self.active_workflows:
                 self.active_workflows[workflow_id].current_stage = "failed"
-                await self._send_websocket_update(
+                await self._publish_event(
                     workflow_id, {"error": str(e), "stage": "workflow_error"}
                 )
+        finally:
+            # Signal completion to every subscriber and drop the signals
+            await self.broadcast.publish(
+                channel=workflow_id, message=WORKFLOW_COMPLETE_MESSAGE
+            )
+            async with self._wf_lock:
+                self.cancel_events.pop(workflow_id, None)
+                self._ws_subscribers.pop(workflow_id, None)
+                if idea_key:
+                    self._inflight.pop(idea_key, None)
+
+    async def _sweep_expired_checkpoints(self):
+        """Periodically prune checkpoint rows for aged-out workflows
+
+        active_workflows evicts entries silently once their TTL lapses,
+        so the sweep diffs the set of workflows ever started against
+        what is still registered and hands the difference to the engine.
+        This keeps checkpoints.db bounded by the same retention window
+        as the in-memory registry. Failed prunes stay in the set and are
+        retried on the next pass.
+        """
+        while True:
+            await asyncio.sleep(CHECKPOINT_PRUNE_INTERVAL_SECONDS)
+            async with self._wf_lock:
+                expired = [
+                    wf_id for wf_id in self._started_workflows if wf_id not in self.active_workflows
+                ]
+            if not expired:
+                continue
+            try:
+                await self.workflow_engine.prune_checkpoints(expired)
+            except Exception:
+                continue
+            async with self._wf_lock:
+                self._started_workflows.difference_update(expired)
 
     async def _process_workflow_event(self, workflow_id: str, event: Dict[str, Any]):
-        """Process workflow events and update state"""
+        """Process a structured workflow event and update state"""
         workflow = self.active_workflows.get(workflow_id)
         if not workflow:
             return
 
-        # Update current stage based on event
-        for key, value in event.items():
-            if "current_stage" in value:
-                workflow.current_stage = value["current_stage"]
-
-            # Add more event processing logic here
-
-    async def _send_websocket_update(self, workflow_id: str, data: Dict[str, Any]):
-        """Send update via WebSocket"""
-        websocket = self.websocket_connections.get(workflow_id)
-        if websocket:
-            try:
-                await websocket.send_json(
-                    {
-                        "workflow_id": workflow_id,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "data": data,
-                    }
-                )
-            except Exception:
-                # Remove failed connection
-                del self.websocket_connections[workflow_id]
+        # Events carry a known {node, state} shape, so this is a single
+        # assignment rather than a scan over the event dict
+        stage = event["state"].get("current_stage")
+        if stage:
+            workflow.current_stage = stage
+        workflow.touch()
+
+    async def _publish_event(self, workflow_id: str, data: Dict[str, Any]):
+        """Publish an event to the workflow's channel"""
+        payload = orjson.dumps(
+            {
+                "workflow_id": workflow_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "data": data,
+            }
+        ).decode()
+        await self.broadcast.publish(channel=workflow_id, message=payload)
 
 
 # Create the FastAPI app instance
@@ -53,14 +53,27 @@ class WorkflowState(BaseModel):
     project_idea: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # ISO strings cached at mutation time so hot read paths (workflow
+    # listings, status polls) skip per-request datetime formatting
+    created_at_iso: str = ""
+    updated_at_iso: str = ""
     current_stage: str
     stages: List[StageResult] = Field(default_factory=list)
     global_context: Dict[str, Any] = Field(default_factory=dict)
 
+    def model_post_init(self, __context: Any) -> None:
+        self.created_at_iso = self.created_at.isoformat()
+        self.updated_at_iso = self.updated_at.isoformat()
+
+    def touch(self):
+        """Refresh the updated timestamp and its cached ISO form"""
+        self.updated_at = datetime.utcnow()
+        self.updated_at_iso = self.updated_at.isoformat()
+
     def add_stage_result(self, result: StageResult):
         """Add a stage result and update timestamp"""
         self.stages.append(result)
-        self.updated_at = datetime.utcnow()
+        self.touch()
 
     def get_stage_output(self, stage_name: str) -> Optional[Dict[str, Any]]:
         """Get output from a specific stage"""